@@ -49,17 +49,24 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 # Initialize app with SQLAlchemy
 db.init_app(app)
 
+# Multi-site support: resolve the storefront from the request host
+import sites
+sites.init_app(app)
+
 # App context setup: models, routes, and DB table creation
 with app.app_context():
     import models  # ensure models are loaded
     import routes  # register routes
+    import commands  # register CLI commands
     db.create_all()  # create tables if they don't exist
+    from migrations import upgrade_site_schema
+    upgrade_site_schema()  # bring pre-multi-site tables up to date
 
 # Global template context
 @app.context_processor
 def inject_sections():
     from models import Section
-    sections = Section.query.all()
+    sections = Section.scoped().all()
     return dict(sections=sections)
 
 # Start development server (not used in production — Render uses gunicorn)
@@ -0,0 +1,234 @@
+"""
+ASGI entry point for high-concurrency deployments.
+
+The read-only public pages (index, section_view, product_view and search) are
+served by async handlers backed by an async SQLAlchemy engine, so a slow query
+parks a coroutine instead of blocking a whole worker. Everything else (admin
+panel, static files, POST requests, unknown URLs) is handed to the regular
+Flask WSGI app, so admin routes keep working unchanged.
+
+Run with:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --proxy-headers
+"""
+import os
+import json
+import asyncio
+import logging
+from urllib.parse import quote
+from asgiref.wsgi import WsgiToAsgi
+from flask import request, redirect, url_for
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers, selectinload
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from werkzeug.exceptions import NotFound
+from app import app, db
+from models import Product, Section
+from sites import current_site, site_template
+
+# Async drivers for the database backends the app supports
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def create_read_engine():
+    """Create the async engine used by the public read path"""
+    with app.app_context():
+        url = db.engine.url
+    backend = url.get_backend_name()
+
+    engine_options = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+    if backend == "postgresql":
+        connect_args = {"server_settings": {"search_path": "public"}}
+        # asyncpg does not understand libpq's sslmode query parameter
+        if "sslmode" in url.query:
+            connect_args["ssl"] = url.query["sslmode"]
+            url = url.difference_update_query(["sslmode"])
+        # A single event loop multiplexes many requests, so the pool is sized
+        # for concurrent queries rather than for worker count
+        engine_options.update(
+            pool_size=int(os.environ.get("ASYNC_DB_POOL_SIZE", 20)),
+            max_overflow=int(os.environ.get("ASYNC_DB_MAX_OVERFLOW", 10)),
+            pool_timeout=int(os.environ.get("ASYNC_DB_POOL_TIMEOUT", 10)),
+            connect_args=connect_args,
+        )
+
+    return create_async_engine(url.set(drivername=ASYNC_DRIVERS[backend]), **engine_options)
+
+# Backrefs such as Product.section only exist once mappers are configured,
+# and the eager-loading options below reference them before any query runs
+configure_mappers()
+
+read_engine = create_read_engine()
+ReadSession = async_sessionmaker(read_engine, expire_on_commit=False)
+
+# Admin, static files and anything not handled below
+wsgi_application = WsgiToAsgi(app)
+
+def render_sync(template_name, context):
+    """Render a template without running the app's (sync) context processors"""
+    context['site'] = current_site()
+    return app.jinja_env.get_template(site_template(template_name)).render(context)
+
+async def render(template_name, **context):
+    """Render in a worker thread so a slow template doesn't stall the event loop"""
+    # to_thread copies the context, so request, url_for and session still work
+    return await asyncio.to_thread(render_sync, template_name, context)
+
+def scoped(model):
+    """Select statement limited to the current request's site"""
+    return select(model).filter_by(site=current_site().key)
+
+async def load_sections(session):
+    return (await session.scalars(scoped(Section))).all()
+
+async def index(session):
+    """Homepage showing featured products and sections"""
+    sections = await load_sections(session)
+    featured_products = (await session.scalars(
+        scoped(Product)
+        .options(selectinload(Product.section))
+        .order_by(Product.created_at.desc())
+        .limit(6)
+    )).all()
+    return await render('index.html', sections=sections, featured_products=featured_products)
+
+async def section_view(session, slug):
+    """View products in a specific section"""
+    section = await session.scalar(scoped(Section).filter_by(slug=slug))
+    if section is None:
+        raise NotFound()
+    products = (await session.scalars(
+        scoped(Product)
+        .filter_by(section_id=section.id)
+        .order_by(Product.created_at.desc())
+    )).all()
+    sections = await load_sections(session)
+    return await render('section.html', section=section, products=products, sections=sections)
+
+async def product_view(session, slug):
+    """View individual product details"""
+    product = await session.scalar(
+        scoped(Product)
+        .filter_by(slug=slug)
+        .options(selectinload(Product.section).selectinload(Section.products))
+    )
+    if product is None:
+        raise NotFound()
+
+    # Parse pros and cons from JSON strings
+    try:
+        pros = json.loads(product.pros) if product.pros else []
+        cons = json.loads(product.cons) if product.cons else []
+    except ValueError:
+        pros = []
+        cons = []
+
+    sections = await load_sections(session)
+    return await render('product.html', product=product, pros=pros, cons=cons, sections=sections)
+
+async def search(session):
+    """Search products"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return redirect(url_for('index'))
+
+    products = (await session.scalars(
+        scoped(Product).filter(Product.search_clause(query))
+    )).all()
+    sections = await load_sections(session)
+    return await render('section.html',
+                        section={'name': f'Search Results for "{query}"', 'description': f'Found {len(products)} products matching your search.'},
+                        products=products,
+                        sections=sections)
+
+# Flask endpoints served by the async read path
+ASYNC_VIEWS = {
+    'index': index,
+    'section_view': section_view,
+    'product_view': product_view,
+    'search': search,
+}
+
+async def run_view(view):
+    """Run an async view and turn its result into a finished Flask response"""
+    try:
+        async with ReadSession() as session:
+            rv = await view(session, **request.view_args)
+    except NotFound:
+        async with ReadSession() as session:
+            sections = await load_sections(session)
+        rv = (await render('base.html', sections=sections), 404)
+    except Exception:
+        logging.exception("Error serving %s on the async read path", request.path)
+        rv = (await render('base.html'), 500)
+
+    # Goes through after_request hooks and saves the session cookie
+    return app.process_response(app.make_response(rv))
+
+def forwarded(headers, name, default):
+    """Value set by the closest proxy, as ProxyFix(x_proto=1, x_host=1) in app.py trusts it"""
+    value = headers.get(name)
+    return value.split(',')[-1].strip() if value else default
+
+def request_context(scope):
+    """Build a Flask request context (routing, url_for, session) from an ASGI scope"""
+    headers = [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']]
+    header_map = dict(headers)
+    # Resolve host and scheme like the WSGI fallback, so both paths pick the same site
+    host = forwarded(header_map, 'x-forwarded-host', header_map.get('host', '%s:%s' % tuple(scope['server'])))
+    scheme = forwarded(header_map, 'x-forwarded-proto', scope['scheme'])
+    client = scope.get('client') or ('', 0)
+    return app.test_request_context(
+        # The builder splits and unquotes its path, so hand it an encoded one:
+        # an encoded '?' or '#' in the URL must stay part of the path
+        quote(scope['path']),
+        base_url=f"{scheme}://{host}{scope.get('root_path', '')}",
+        query_string=scope['query_string'].decode('latin-1'),
+        method=scope['method'],
+        # Host comes from base_url; a Host header would override it
+        headers=[(name, value) for name, value in headers if name != 'host'],
+        environ_overrides={'REMOTE_ADDR': client[0]},
+    )
+
+async def send_response(send, response, include_body=True):
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in response.headers.items()],
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': response.get_data() if include_body else b'',
+    })
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await read_engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    """ASGI application: async read path with the Flask app as fallback"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+        with request_context(scope):
+            view = ASYNC_VIEWS.get(request.endpoint)
+            if view is not None:
+                response = await run_view(view)
+        if view is not None:
+            await send_response(send, response, include_body=scope['method'] != 'HEAD')
+            return
+
+    await wsgi_application(scope, receive, send)
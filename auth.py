@@ -1,5 +1,6 @@
 import os
 import functools
+import hmac
 from flask import request, Response, session, redirect, url_for, flash, abort
 
 def check_auth(username, password):
@@ -53,4 +54,20 @@ def session_auth_required(f):
         if not session.get('admin_authenticated'):
             return redirect(url_for('admin_login'))
         return f(*args, **kwargs)
-    return decorated
\ No newline at end of file
+    return decorated
+
+def requires_feed_token(f):
+    """Decorator that requires the change feed bearer token (CHANGE_FEED_TOKEN)"""
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        feed_token = os.environ.get('CHANGE_FEED_TOKEN')
+        # Hide the feed entirely until a token is configured
+        if not feed_token:
+            abort(404)
+        
+        auth_header = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(auth_header.encode(), f'Bearer {feed_token}'.encode()):
+            return Response('Invalid change feed token', 401,
+                            {'WWW-Authenticate': 'Bearer'})
+        return f(*args, **kwargs)
+    return decorated
@@ -0,0 +1,118 @@
+"""
+Throughput benchmark for the public read path.
+
+Compares the sync gunicorn deployment against the ASGI one (asgi.py) at equal
+memory. Start each server separately, adjust worker counts until the reported
+RSS is about the same, then compare requests per second:
+
+    gunicorn --bind 0.0.0.0:5000 --workers 4 main:app
+    python benchmark.py --url http://localhost:5000 --pid <gunicorn master pid> \
+        --path / --path /section/<slug> --path /product/<slug> --path '/search?q=<term>'
+
+    uvicorn asgi:application --port 5001 --workers 1
+    python benchmark.py --url http://localhost:5001 --pid <uvicorn pid> --path ...
+
+Pass the same paths to both runs. Use section and product slugs that exist in
+the database, so that all four read routes are measured.
+
+Only the standard library is used, so it runs anywhere the app does.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlsplit
+
+def process_tree_rss(pid):
+    """Resident memory in kB of a process and all its descendants (Linux only)"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+                        break
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except FileNotFoundError:
+            continue
+    return total
+
+def worker(url, paths, deadline, latencies, errors, lock):
+    """Issue requests over one keep-alive connection until the deadline"""
+    parts = urlsplit(url)
+    connection_class = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    local_latencies = []
+    local_errors = 0
+    i = 0
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            # A 404 from a mistyped --path is fast and would inflate throughput
+            if 200 <= response.status < 400:
+                local_latencies.append(time.perf_counter() - start)
+            else:
+                local_errors += 1
+        except (OSError, HTTPException):
+            local_errors += 1
+            connection.close()
+            connection = connection_class(parts.netloc, timeout=30)
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+def run(url, paths, concurrency, duration):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(url, paths, deadline, latencies, errors, lock))
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000', help='base URL of the running server')
+    parser.add_argument('--path', action='append', dest='paths', required=True,
+                        help='path to request (repeatable); include section, product and search pages')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent client connections')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds to run')
+    parser.add_argument('--pid', type=int, help='server master PID, to report memory use')
+    args = parser.parse_args()
+
+    paths = args.paths
+    latencies, errors = run(args.url.rstrip('/'), paths, args.concurrency, args.duration)
+
+    print(f'URL:          {args.url}')
+    print(f'Paths:        {", ".join(paths)}')
+    print(f'Concurrency:  {args.concurrency}')
+    print(f'Requests:     {len(latencies)} ok, {errors} errors')
+    print(f'Throughput:   {len(latencies) / args.duration:.1f} req/s')
+    if latencies:
+        latencies.sort()
+        print(f'Latency p50:  {statistics.median(latencies) * 1000:.1f} ms')
+        print(f'Latency p99:  {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms')
+    if args.pid:
+        print(f'Server RSS:   {process_tree_rss(args.pid) / 1024:.1f} MB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+import click
+from datetime import datetime, timedelta
+from app import app
+from models import ChangeLog
+
+@app.cli.command('compact-changes')
+@click.option('--days', default=30, show_default=True, help='Keep every entry newer than this many days')
+def compact_changes(days):
+    """Compact the change log, keeping only the latest entry per row for old history"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = ChangeLog.compact(cutoff)
+    click.echo(f'Removed {deleted} change log entries older than {cutoff:%Y-%m-%d %H:%M}')
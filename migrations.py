@@ -0,0 +1,75 @@
+"""
+Startup schema upgrade for databases created before multi-site support.
+
+db.create_all() only creates missing tables, so existing section/product
+tables are brought up to date here: the site column is added, the old
+global UNIQUE(slug)/UNIQUE(name) constraints are replaced by the per-site
+ones declared on the models, and missing indexes are created. SQLite cannot
+drop constraints, so there the table is rebuilt and its rows copied across.
+"""
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import AddConstraint
+from app import db
+from models import Product, Section
+from sites import DEFAULT_SITE_KEY
+
+# Arbitrary key for the Postgres advisory lock that serialises the upgrade
+# when several gunicorn workers start at once
+UPGRADE_LOCK_KEY = 72177
+
+def upgrade_site_schema():
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': UPGRADE_LOCK_KEY})
+        # Parents before children, so a rebuilt product table points at the new section table
+        for model in (Section, Product):
+            upgrade_table(connection, model.__table__)
+
+def upgrade_table(connection, table):
+    inspector = inspect(connection)
+    columns = [column['name'] for column in inspector.get_columns(table.name)]
+    if 'site' not in columns:
+        logging.info(f"Adding site column to {table.name}")
+        connection.execute(text(
+            f"ALTER TABLE {table.name} ADD COLUMN site VARCHAR(50) NOT NULL DEFAULT '{DEFAULT_SITE_KEY}'"
+        ))
+        columns.append('site')
+
+    # Unique constraints that predate per-site scoping don't include the site column
+    legacy = [constraint for constraint in inspector.get_unique_constraints(table.name)
+              if 'site' not in constraint['column_names']]
+    if legacy and connection.dialect.name == 'sqlite':
+        rebuild_sqlite_table(connection, inspector, table, columns)
+        return
+
+    quote = connection.dialect.identifier_preparer.quote
+    for constraint in legacy:
+        logging.info(f"Dropping constraint {constraint['name']} on {table.name}")
+        connection.execute(text(f"ALTER TABLE {quote(table.name)} DROP CONSTRAINT {quote(constraint['name'])}"))
+
+    existing = {constraint['name'] for constraint in inspect(connection).get_unique_constraints(table.name)}
+    for constraint in table.constraints:
+        if isinstance(constraint, db.UniqueConstraint) and constraint.name not in existing:
+            logging.info(f"Adding constraint {constraint.name} on {table.name}")
+            connection.execute(AddConstraint(constraint))
+
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+def rebuild_sqlite_table(connection, inspector, table, columns):
+    """Recreate a SQLite table from the model definition and copy its rows across"""
+    logging.info(f"Rebuilding {table.name} with per-site unique constraints")
+    old_name = f'{table.name}_old'
+    copied = ', '.join(column.name for column in table.columns if column.name in columns)
+
+    # Index names are global in SQLite; free them up for the new table
+    for index in inspector.get_indexes(table.name):
+        connection.execute(text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+    # Keep other tables' foreign keys pointing at the original name while renaming
+    connection.execute(text('PRAGMA legacy_alter_table=ON'))
+    connection.execute(text(f'ALTER TABLE "{table.name}" RENAME TO "{old_name}"'))
+    connection.execute(text('PRAGMA legacy_alter_table=OFF'))
+    table.create(connection)
+    connection.execute(text(f'INSERT INTO "{table.name}" ({copied}) SELECT {copied} FROM "{old_name}"'))
+    connection.execute(text(f'DROP TABLE "{old_name}"'))
@@ -1,21 +1,52 @@
+import json
 from app import db
 from datetime import datetime
-from sqlalchemy import func
+from flask import has_request_context, request
+from sqlalchemy import func, select, text
+from sites import DEFAULT_SITE_KEY, current_site
+
+class SiteScopedMixin:
+    """Rows belong to one storefront, identified by its site key"""
+    site = db.Column(db.String(50), nullable=False, default=DEFAULT_SITE_KEY)
+
+    @classmethod
+    def scoped(cls):
+        """Query limited to the current request's site"""
+        return cls.query.filter_by(site=current_site().key)
+
+    def to_dict(self):
+        """Column values as JSON-serialisable data"""
+        data = {}
+        for column in self.__table__.columns:
+            value = getattr(self, column.name)
+            data[column.name] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+class Section(SiteScopedMixin, db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('site', 'name', name='uq_section_site_name'),
+        db.UniqueConstraint('site', 'slug', name='uq_section_site_slug'),
+    )
 
-class Section(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False, unique=True)
-    slug = db.Column(db.String(100), nullable=False, unique=True)
+    name = db.Column(db.String(100), nullable=False)
+    slug = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship with products
     products = db.relationship('Product', backref='section', lazy=True, cascade='all, delete-orphan')
 
-class Product(db.Model):
+class Product(SiteScopedMixin, db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('site', 'slug', name='uq_product_site_slug'),
+        # Listing pages sort a site's products by creation date
+        db.Index('ix_product_site_created_at', 'site', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
-    slug = db.Column(db.String(200), nullable=False, unique=True)
+    slug = db.Column(db.String(200), nullable=False)
     affiliate_link = db.Column(db.Text, nullable=False)
     price = db.Column(db.String(50))
     image_url = db.Column(db.Text)
@@ -40,21 +71,90 @@ class Product(db.Model):
     
     # Search functionality
     @classmethod
-    def search(cls, query):
-        return cls.query.filter(
-            db.or_(
-                cls.name.contains(query),
-                cls.short_description.contains(query),
-                cls.full_review.contains(query)
-            )
-        ).all()
-    # Search functionality
+    def search_clause(cls, query):
+        """Filter clause shared by the sync and async search paths"""
+        return db.or_(
+            cls.name.contains(query),
+            cls.short_description.contains(query),
+            cls.full_review.contains(query)
+        )
+
     @classmethod
     def search(cls, query):
-        return cls.query.filter(
-            db.or_(
-                cls.name.contains(query),
-                cls.short_description.contains(query),
-                cls.full_review.contains(query)
-            )
-        ).all()
+        return cls.scoped().filter(cls.search_clause(query)).all()
+
+# Arbitrary key for the Postgres advisory lock that orders change log writes
+CHANGE_LOG_LOCK_KEY = 72178
+
+class ChangeLog(SiteScopedMixin, db.Model):
+    """Append-only log of admin edits, also served as an incremental change feed"""
+    __table_args__ = (
+        # The feed reads a site's entries in id order starting from a cursor
+        db.Index('ix_change_log_site_id', 'site', 'id'),
+        db.Index('ix_change_log_created_at', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # 'product' or 'section'
+    entity_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(10), nullable=False)  # 'create', 'update' or 'delete'
+    data = db.Column(db.Text)  # JSON snapshot after the change, null for deletes
+    changes = db.Column(db.Text)  # JSON {field: [old, new]}
+    actor = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def record(cls, action, obj, before=None):
+        """Add an entry for obj to the current transaction, so it commits with the edit
+
+        Entry ids are the feed cursor, so they have to become visible in id
+        order: otherwise a reader could see id N+1, move past it and never see
+        a slower transaction's N. Writers therefore take a lock that is held
+        until commit before inserting. SQLite gets this from its single writer
+        lock; on Postgres it is a transaction-scoped advisory lock. The edit
+        itself is flushed first, so only the log insert runs under the lock.
+        Call this right before committing.
+        """
+        db.session.flush()  # write the edit and assign a new row's id
+        if db.session.get_bind().dialect.name == 'postgresql':
+            db.session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': CHANGE_LOG_LOCK_KEY})
+
+        after = None if action == 'delete' else obj.to_dict()
+        old_values = before or {}
+        new_values = after or {}
+        changes = {
+            field: [old_values.get(field), new_values.get(field)]
+            for field in set(old_values) | set(new_values)
+            if old_values.get(field) != new_values.get(field)
+        }
+
+        actor = None
+        if has_request_context() and request.authorization:
+            actor = request.authorization.username
+
+        entry = cls(
+            site=obj.site,
+            entity=obj.__tablename__,
+            entity_id=obj.id,
+            action=action,
+            data=json.dumps(after) if after is not None else None,
+            changes=json.dumps(changes),
+            actor=actor
+        )
+        db.session.add(entry)
+        return entry
+
+    @classmethod
+    def compact(cls, before):
+        """Drop entries older than before, keeping the latest entry per entity
+
+        Every entry carries a full snapshot, so a consumer replaying the
+        compacted log still ends up with the current state of every row.
+        """
+        latest = select(func.max(cls.id)).group_by(cls.site, cls.entity, cls.entity_id)
+        deleted = cls.query.filter(
+            cls.created_at < before,
+            cls.id.notin_(latest)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
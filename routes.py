@@ -1,8 +1,9 @@
 from flask import render_template, request, redirect, url_for, flash, jsonify, session, abort
 from app import app, db
-from models import Product, Section
+from models import ChangeLog, Product, Section
 from ai_service import generate_product_content, generate_section_description
-from auth import requires_auth
+from auth import requires_auth, requires_feed_token
+from sites import current_site, site_template
 import re
 import json
 from datetime import datetime, timezone
@@ -17,21 +18,21 @@ def create_slug(text):
 @app.route('/')
 def index():
     """Homepage showing featured products and sections"""
-    sections = Section.query.all()
-    featured_products = Product.query.order_by(Product.created_at.desc()).limit(6).all()
-    return render_template('index.html', sections=sections, featured_products=featured_products)
+    sections = Section.scoped().all()
+    featured_products = Product.scoped().order_by(Product.created_at.desc()).limit(6).all()
+    return render_template(site_template('index.html'), sections=sections, featured_products=featured_products)
 
 @app.route('/section/<slug>')
 def section_view(slug):
     """View products in a specific section"""
-    section = Section.query.filter_by(slug=slug).first_or_404()
-    products = Product.query.filter_by(section_id=section.id).order_by(Product.created_at.desc()).all()
-    return render_template('section.html', section=section, products=products)
+    section = Section.scoped().filter_by(slug=slug).first_or_404()
+    products = Product.scoped().filter_by(section_id=section.id).order_by(Product.created_at.desc()).all()
+    return render_template(site_template('section.html'), section=section, products=products)
 
 @app.route('/product/<slug>')
 def product_view(slug):
     """View individual product details"""
-    product = Product.query.filter_by(slug=slug).first_or_404()
+    product = Product.scoped().filter_by(slug=slug).first_or_404()
     
     # Parse pros and cons from JSON strings
     try:
@@ -41,7 +42,7 @@ def product_view(slug):
         pros = []
         cons = []
     
-    return render_template('product.html', product=product, pros=pros, cons=cons)
+    return render_template(site_template('product.html'), product=product, pros=pros, cons=cons)
 
 @app.route('/search')
 def search():
@@ -51,7 +52,7 @@ def search():
         return redirect(url_for('index'))
     
     products = Product.search(query)
-    return render_template('section.html', 
+    return render_template(site_template('section.html'), 
                          section={'name': f'Search Results for "{query}"', 'description': f'Found {len(products)} products matching your search.'}, 
                          products=products)
 
@@ -90,8 +91,8 @@ def admin_logout():
 @requires_auth
 def chinmay_control_panel():
     """Admin panel for managing products and sections"""
-    sections = Section.query.all()
-    products = Product.query.order_by(Product.created_at.desc()).all()
+    sections = Section.scoped().all()
+    products = Product.scoped().order_by(Product.created_at.desc()).all()
     return render_template('admin.html', sections=sections, products=products)
 
 @app.route('/chinmay_control_panel/section/add', methods=['POST'])
@@ -106,7 +107,7 @@ def add_section():
     slug = create_slug(name)
     
     # Check if section already exists
-    if Section.query.filter_by(slug=slug).first():
+    if Section.scoped().filter_by(slug=slug).first():
         flash('Section already exists', 'error')
         return redirect(url_for('chinmay_control_panel'))
     
@@ -114,10 +115,12 @@ def add_section():
     description = generate_section_description(name)
     
     section = Section()
+    section.site = current_site().key
     section.name = name
     section.slug = slug
     section.description = description
     db.session.add(section)
+    ChangeLog.record('create', section)
     db.session.commit()
     
     flash(f'Section "{name}" added successfully!', 'success')
@@ -141,7 +144,7 @@ def add_product():
             flash('Product name, affiliate link, and section are required', 'error')
             return redirect(url_for('chinmay_control_panel'))
 
-        section = Section.query.get(section_id)
+        section = Section.scoped().filter_by(id=section_id).first()
         if not section:
             flash('Invalid section selected', 'error')
             return redirect(url_for('chinmay_control_panel'))
@@ -150,7 +153,7 @@ def add_product():
         slug = create_slug(name)
         counter = 1
         original_slug = slug
-        while Product.query.filter_by(slug=slug).first():
+        while Product.scoped().filter_by(slug=slug).first():
             slug = f"{original_slug}-{counter}"
             counter += 1
 
@@ -160,6 +163,7 @@ def add_product():
 
         # Create product instance
         product = Product(
+            site=current_site().key,
             name=name,
             slug=slug,
             affiliate_link=affiliate_link,
@@ -177,6 +181,7 @@ def add_product():
 
         # Save to DB
         db.session.add(product)
+        ChangeLog.record('create', product)
         db.session.commit()
 
         flash(f'Product "{name}" added successfully with AI-generated content!', 'success')
@@ -191,8 +196,10 @@ def add_product():
 @requires_auth
 def delete_product(product_id):
     """Delete a product"""
-    product = Product.query.get_or_404(product_id)
+    product = Product.scoped().filter_by(id=product_id).first_or_404()
+    before = product.to_dict()
     db.session.delete(product)
+    ChangeLog.record('delete', product, before=before)
     db.session.commit()
     flash(f'Product "{product.name}" deleted successfully!', 'success')
     return redirect(url_for('chinmay_control_panel'))
@@ -201,14 +208,16 @@ def delete_product(product_id):
 @requires_auth
 def delete_section(section_id):
     """Delete a section and all its products"""
-    section = Section.query.get_or_404(section_id)
+    section = Section.scoped().filter_by(id=section_id).first_or_404()
     
     # Check if section has products
     if section.products:
         flash(f'Cannot delete section "{section.name}" because it contains products. Delete products first.', 'error')
         return redirect(url_for('chinmay_control_panel'))
     
+    before = section.to_dict()
     db.session.delete(section)
+    ChangeLog.record('delete', section, before=before)
     db.session.commit()
     flash(f'Section "{section.name}" deleted successfully!', 'success')
     return redirect(url_for('chinmay_control_panel'))
@@ -219,8 +228,8 @@ def delete_section(section_id):
 @requires_auth
 def edit_product_form(product_id):
     """Show product edit form"""
-    product = Product.query.get_or_404(product_id)
-    sections = Section.query.all()
+    product = Product.scoped().filter_by(id=product_id).first_or_404()
+    sections = Section.scoped().all()
     
     # Parse pros and cons from JSON strings for editing
     try:
@@ -240,7 +249,8 @@ def edit_product_form(product_id):
 @requires_auth
 def update_product(product_id):
     """Update existing product"""
-    product = Product.query.get_or_404(product_id)
+    product = Product.scoped().filter_by(id=product_id).first_or_404()
+    before = product.to_dict()
     
     name = request.form.get('name', '').strip()
     affiliate_link = request.form.get('affiliate_link', '').strip()
@@ -266,7 +276,7 @@ def update_product(product_id):
         flash('Product name, affiliate link, and section are required', 'error')
         return redirect(url_for('edit_product_form', product_id=product_id))
     
-    section = Section.query.get(section_id)
+    section = Section.scoped().filter_by(id=section_id).first()
     if not section:
         flash('Invalid section selected', 'error')
         return redirect(url_for('edit_product_form', product_id=product_id))
@@ -295,7 +305,7 @@ def update_product(product_id):
             original_slug = new_slug
             
             # Ensure unique slug
-            while Product.query.filter(Product.slug == new_slug, Product.id != product_id).first():
+            while Product.scoped().filter(Product.slug == new_slug, Product.id != product_id).first():
                 new_slug = f"{original_slug}-{counter}"
                 counter += 1
             
@@ -339,6 +349,7 @@ def update_product(product_id):
         # Update timestamp
         product.updated_at = datetime.now(timezone.utc)
         
+        ChangeLog.record('update', product, before=before)
         db.session.commit()
         
     except Exception as e:
@@ -352,7 +363,8 @@ def update_product(product_id):
 @requires_auth
 def quick_edit_product(product_id):
     """Quick edit for basic product info via AJAX"""
-    product = Product.query.get_or_404(product_id)
+    product = Product.scoped().filter_by(id=product_id).first_or_404()
+    before = product.to_dict()
     
     field = request.form.get('field')
     value = request.form.get('value', '').strip()
@@ -365,7 +377,7 @@ def quick_edit_product(product_id):
             counter = 1
             original_slug = new_slug
             
-            while Product.query.filter(Product.slug == new_slug, Product.id != product_id).first():
+            while Product.scoped().filter(Product.slug == new_slug, Product.id != product_id).first():
                 new_slug = f"{original_slug}-{counter}"
                 counter += 1
             
@@ -384,6 +396,7 @@ def quick_edit_product(product_id):
         
         # Update timestamp
         product.updated_at = datetime.now(timezone.utc)
+        ChangeLog.record('update', product, before=before)
         db.session.commit()
         
         return jsonify({'success': True, 'message': f'{field.title()} updated successfully'})
@@ -392,14 +405,45 @@ def quick_edit_product(product_id):
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/changes')
+@requires_feed_token
+def changes_feed():
+    """Incremental change feed: entries after the `since` cursor, oldest first"""
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', 100)), 1000)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    
+    entries = ChangeLog.scoped().filter(ChangeLog.id > since).order_by(ChangeLog.id).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    
+    return jsonify({
+        'changes': [{
+            'id': entry.id,
+            'entity': entry.entity,
+            'entity_id': entry.entity_id,
+            'action': entry.action,
+            'data': json.loads(entry.data) if entry.data else None,
+            'changes': json.loads(entry.changes) if entry.changes else {},
+            'actor': entry.actor,
+            'created_at': entry.created_at.isoformat()
+        } for entry in entries],
+        'next_since': entries[-1].id if entries else since,
+        'has_more': has_more
+    })
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
-    sections = Section.query.all()
-    return render_template('base.html', sections=sections), 404
+    sections = Section.scoped().all()
+    return render_template(site_template('base.html'), sections=sections), 404
 
 @app.errorhandler(500)
 def internal_error(error):
     db.session.rollback()
-    sections = Section.query.all()
-    return render_template('base.html', sections=sections), 500
+    sections = Section.scoped().all()
+    return render_template(site_template('base.html'), sections=sections), 500
@@ -0,0 +1,103 @@
+"""
+Multi-site support: one process serves several storefronts.
+
+Each request is mapped to a site by its host name. Sections and products carry
+the site's key, templates can be overridden per site under
+templates/sites/<key>/, and branding comes from the site config. Everything
+else (database pool, template cache) is shared between sites.
+
+Sites are configured with a JSON file pointed to by SITES_CONFIG:
+
+    [
+        {"key": "techdeals", "name": "TechDeals", "hosts": ["techdeals.com", "www.techdeals.com"],
+         "tagline": "Honest Gadget Reviews"}
+    ]
+
+Requests for hosts that are not listed are served by the default site
+(DEFAULT_SITE, "default" unless set).
+"""
+import os
+import json
+import functools
+from flask import current_app, g, request
+from jinja2 import TemplateNotFound
+
+DEFAULT_SITE_KEY = os.environ.get('DEFAULT_SITE', 'default')
+
+class Site:
+    """Branding and routing settings for one storefront"""
+
+    def __init__(self, key, name='DiscoverCarts', hosts=(), tagline='Smart Product Reviews',
+                 meta_description='Discover the best products with AI-powered reviews and recommendations. Find deals on tech, furniture, fashion and more.',
+                 about='Powered by artificial intelligence to bring you the most comprehensive and unbiased product reviews. Find the best deals on tech, furniture, fashion, and more.'):
+        self.key = key
+        self.name = name
+        self.hosts = [host.lower() for host in hosts]
+        self.tagline = tagline
+        self.meta_description = meta_description
+        self.about = about
+
+def load_sites():
+    """Load site definitions from SITES_CONFIG, always including the default site
+
+    A broken config fails startup rather than quietly serving every host the
+    default storefront.
+    """
+    sites = {}
+    config_path = os.environ.get('SITES_CONFIG')
+    if config_path:
+        with open(config_path) as config_file:
+            for entry in json.load(config_file):
+                site = Site(**entry)
+                if site.key in sites:
+                    raise ValueError(f"Duplicate site key {site.key!r} in {config_path}")
+                sites[site.key] = site
+
+    sites.setdefault(DEFAULT_SITE_KEY, Site(DEFAULT_SITE_KEY))
+    return sites
+
+def index_hosts(sites):
+    """Map each host name to its site, rejecting hosts claimed by two sites"""
+    sites_by_host = {}
+    for site in sites.values():
+        for host in site.hosts:
+            if host in sites_by_host:
+                raise ValueError(f"Host {host!r} is configured for both {sites_by_host[host].key!r} and {site.key!r}")
+            sites_by_host[host] = site
+    return sites_by_host
+
+SITES = load_sites()
+SITES_BY_HOST = index_hosts(SITES)
+
+def site_for_host(host):
+    """Resolve a Host header (with or without port) to a site"""
+    hostname = host.split(':')[0].lower() if host else ''
+    return SITES_BY_HOST.get(hostname, SITES[DEFAULT_SITE_KEY])
+
+def current_site():
+    """Site for the current request, resolved once per request"""
+    if 'site' not in g:
+        g.site = site_for_host(request.host)
+    return g.site
+
+@functools.lru_cache(maxsize=None)
+def resolve_template(jinja_env, site_key, template_name):
+    """Pick the site's override of a template if there is one"""
+    override = f'sites/{site_key}/{template_name}'
+    try:
+        jinja_env.loader.get_source(jinja_env, override)
+    except TemplateNotFound:
+        return template_name
+    return override
+
+def site_template(template_name):
+    """Template name to render for the current site"""
+    return resolve_template(current_app.jinja_env, current_site().key, template_name)
+
+def init_app(app):
+    """Register site-aware template helpers on the app"""
+    app.jinja_env.globals['site_template'] = site_template
+
+    @app.context_processor
+    def inject_site():
+        return dict(site=current_site())
@@ -0,0 +1,12 @@
+import os
+import sys
+import json
+import tempfile
+
+# Point the app at a throwaway SQLite database and a second storefront before it is imported
+test_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(test_dir, 'test.db')
+os.environ['SITES_CONFIG'] = os.path.join(test_dir, 'sites.json')
+with open(os.environ['SITES_CONFIG'], 'w') as sites_file:
+    json.dump([{'key': 'gadgets', 'name': 'GadgetHub', 'hosts': ['gadgets.example']}], sites_file)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
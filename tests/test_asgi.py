@@ -0,0 +1,100 @@
+import asyncio
+import json
+import pytest
+import asgi
+from app import app, db
+from models import Product, Section
+
+@pytest.fixture(scope='module', autouse=True)
+def catalog():
+    with app.app_context():
+        section = Section(site='default', name='Tech', slug='tech', description='Gadgets')
+        db.session.add(section)
+        db.session.flush()
+        db.session.add(Product(site='default', name='Laptop', slug='laptop', affiliate_link='https://example.com',
+                               section_id=section.id, short_description='A laptop',
+                               pros=json.dumps(['Fast']), cons=json.dumps(['Heavy'])))
+        db.session.commit()
+
+def request(path, query_string=b'', method='GET', headers=()):
+    """Drive asgi.application with a real ASGI HTTP scope"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string,
+        'root_path': '',
+        'headers': [(b'host', b'localhost')] + list(headers),
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    start = messages[0]
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], dict(start['headers']), body
+
+@pytest.mark.parametrize('path, query_string, status, text', [
+    ('/', b'', 200, b'Tech'),
+    ('/section/tech', b'', 200, b'Laptop'),
+    ('/product/laptop', b'', 200, b'Fast'),
+    ('/search', b'q=Laptop', 200, b'Found 1 products'),
+    ('/product/missing', b'', 404, b''),
+])
+def test_read_routes(path, query_string, status, text):
+    code, _, body = request(path, query_string)
+    assert code == status
+    assert text in body
+
+@pytest.mark.parametrize('path', ['/product/a?b', '/product/a#b', '/chinmay_control_panel/a?b'])
+def test_encoded_reserved_characters_stay_in_path(path):
+    # uvicorn passes /product/a%3Fb and /product/a%23b decoded in scope['path']
+    code, _, _ = request(path)
+    assert code == 404
+
+def test_encoded_hash_does_not_truncate_slug():
+    with app.app_context():
+        section = Section.query.filter_by(slug='tech').first()
+        db.session.add(Product(site='default', name='Hash', slug='a#b', affiliate_link='https://example.com',
+                               short_description='Hash in the slug',
+                               section_id=section.id))
+        db.session.commit()
+    code, _, body = request('/product/a#b')
+    assert code == 200
+    assert b'Hash' in body
+
+def test_search_without_query_redirects():
+    code, headers, _ = request('/search')
+    assert code == 302
+    assert headers[b'location'].endswith(b'/')
+
+def test_head_has_no_body():
+    code, _, body = request('/', method='HEAD')
+    assert code == 200
+    assert body == b''
+
+def test_admin_falls_back_to_flask():
+    code, _, _ = request('/chinmay_control_panel', b'tab=products')
+    assert code == 401
+
+def test_site_resolved_from_forwarded_host():
+    # Same resolution as the WSGI fallback behind ProxyFix
+    _, _, body = request('/', headers=[(b'x-forwarded-host', b'gadgets.example')])
+    assert b'GadgetHub' in body
+    assert b'Tech' not in body
+    code, _, _ = request('/product/laptop', headers=[(b'x-forwarded-host', b'gadgets.example')])
+    assert code == 404
+    # Pages served by the Flask fallback resolve the same storefront
+    _, _, body = request('/chinmay_control_panel/login', headers=[(b'x-forwarded-host', b'gadgets.example')])
+    assert b'GadgetHub' in body
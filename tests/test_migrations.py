@@ -0,0 +1,45 @@
+import os
+import tempfile
+from sqlalchemy import create_engine, inspect, text
+from migrations import upgrade_table
+from models import Product, Section
+
+# Schema as created by db.create_all() before multi-site support
+LEGACY_SCHEMA = [
+    """CREATE TABLE section (id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, slug VARCHAR(100) NOT NULL,
+       description TEXT, created_at DATETIME, PRIMARY KEY (id), UNIQUE (name), UNIQUE (slug))""",
+    """CREATE TABLE product (id INTEGER NOT NULL, name VARCHAR(200) NOT NULL, slug VARCHAR(200) NOT NULL,
+       affiliate_link TEXT NOT NULL, price VARCHAR(50), image_url TEXT, discount_percentage FLOAT,
+       short_description TEXT, full_review TEXT, pros TEXT, cons TEXT, seo_title VARCHAR(200),
+       meta_description TEXT, section_id INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME,
+       PRIMARY KEY (id), UNIQUE (slug), FOREIGN KEY(section_id) REFERENCES section (id))""",
+    "INSERT INTO section (id, name, slug) VALUES (1, 'Tech', 'tech')",
+    "INSERT INTO product (id, name, slug, affiliate_link, section_id) VALUES (1, 'Laptop', 'laptop', 'x', 1)",
+]
+
+def upgrade(engine):
+    with engine.begin() as connection:
+        for model in (Section, Product):
+            upgrade_table(connection, model.__table__)
+
+def test_upgrade_legacy_sqlite_tables():
+    engine = create_engine('sqlite:///' + os.path.join(tempfile.mkdtemp(), 'legacy.db'))
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+
+    upgrade(engine)
+    upgrade(engine)  # running again on startup is a no-op
+
+    inspector = inspect(engine)
+    assert {c['name'] for c in inspector.get_unique_constraints('product')} == {'uq_product_site_slug'}
+    assert {c['name'] for c in inspector.get_unique_constraints('section')} == {'uq_section_site_name', 'uq_section_site_slug'}
+    assert 'ix_product_site_created_at' in {i['name'] for i in inspector.get_indexes('product')}
+    assert inspector.get_foreign_keys('product')[0]['referred_table'] == 'section'
+
+    with engine.begin() as connection:
+        assert connection.execute(text('SELECT site, slug FROM product')).all() == [('default', 'laptop')]
+        # A second site can now reuse the slug
+        connection.execute(text("INSERT INTO section (id, site, name, slug) VALUES (2, 'gadgets', 'Tech', 'tech')"))
+        connection.execute(text("INSERT INTO product (id, site, name, slug, affiliate_link, section_id) "
+                                "VALUES (2, 'gadgets', 'Laptop', 'laptop', 'x', 2)"))
@@ -0,0 +1,34 @@
+import json
+import pytest
+from sites import Site, index_hosts, load_sites
+
+def write_config(tmp_path, monkeypatch, content):
+    config = tmp_path / 'sites.json'
+    config.write_text(content)
+    monkeypatch.setenv('SITES_CONFIG', str(config))
+
+def test_load_sites_includes_default(tmp_path, monkeypatch):
+    write_config(tmp_path, monkeypatch, json.dumps([{'key': 'gadgets', 'hosts': ['Gadgets.Example']}]))
+    sites = load_sites()
+    assert set(sites) == {'gadgets', 'default'}
+    assert sites['gadgets'].hosts == ['gadgets.example']
+
+@pytest.mark.parametrize('content, error', [
+    ('not json', ValueError),
+    (json.dumps([{'key': 'gadgets', 'colour': 'blue'}]), TypeError),
+    (json.dumps([{'key': 'gadgets'}, {'key': 'gadgets'}]), ValueError),
+])
+def test_broken_config_fails(tmp_path, monkeypatch, content, error):
+    write_config(tmp_path, monkeypatch, content)
+    with pytest.raises(error):
+        load_sites()
+
+def test_missing_config_fails(tmp_path, monkeypatch):
+    monkeypatch.setenv('SITES_CONFIG', str(tmp_path / 'missing.json'))
+    with pytest.raises(FileNotFoundError):
+        load_sites()
+
+def test_duplicate_hosts_rejected():
+    sites = {'a': Site('a', hosts=['shop.example']), 'b': Site('b', hosts=['SHOP.example'])}
+    with pytest.raises(ValueError, match='shop.example'):
+        index_hosts(sites)